@@ -1,12 +1,9 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
 from PIL import Image
 import os
 
-# Custom CSS
-st.markdown("""
+# Static page content
+PAGE_CSS = """
     <style>
     .main {
         padding: 2rem;
@@ -58,13 +55,6 @@ st.markdown("""
         background-color: #0074b7;
         color: white;
     }
-    .logo-container {
-        width: 100%;
-        display: flex;
-        justify-content: center;
-        align-items: center;
-        margin: 0 auto 2rem auto;
-    }
     .logo {
         max-width: 300px;
         height: auto;
@@ -92,59 +82,37 @@ st.markdown("""
         color: white;
     }
     </style>
-""", unsafe_allow_html=True)
+"""
 
-# Load and display logo
-logo_path = "../AISG Logo.png"
-if os.path.exists(logo_path):
-    logo = Image.open(logo_path)
-    st.markdown('<div class="logo-container">', unsafe_allow_html=True)
-    st.image(logo, width=300, use_container_width=False)
-    st.markdown('</div>', unsafe_allow_html=True)
-
-# Header Section
-st.markdown("""
+PAGE_HEADER_HTML = """
     <div class="header">PlaceWell: Smarter EIH Site Planning for San Jose</div>
     <div class="subtitle">A data-driven platform for equitable and feasible Emergency Interim Housing placement</div>
-""", unsafe_allow_html=True)
+"""
 
-# Feature Cards Section - Two columns for first two features
-col1, col2 = st.columns(2)
-
-with col1:
-    st.markdown("""
+SCORING_CARD_HTML = """
         <div class="feature-card">
             <div class="feature-title">📊 Scoring Model</div>
             <p>Evaluate potential EIH locations using our comprehensive scoring system that considers multiple factors including population needs, accessibility, and community impact.</p>
         </div>
-    """, unsafe_allow_html=True)
-    if st.button("Launch Scoring Model", key="scoring_button"):
-        st.switch_page("pages/Scoring_Model.py")
+"""
 
-with col2:
-    st.markdown("""
+FEASIBILITY_CARD_HTML = """
         <div class="feature-card">
             <div class="feature-title">🏗️ Build Feasibility Analyzer</div>
             <p>Analyze the feasibility of establishing EIH sites by considering zoning regulations, land availability, and infrastructure requirements.</p>
         </div>
-    """, unsafe_allow_html=True)
-    if st.button("Launch Feasibility Analyzer", key="feasibility_button"):
-        st.switch_page("pages/Build_Feasibility.py")
+"""
 
-# Third feature in its own centered column
-st.markdown("""
+COVERAGE_CARD_HTML = """
     <div style="max-width: 600px; margin: 0 auto;">
         <div class="feature-card">
             <div class="feature-title">🗺️ Service Area Coverage</div>
             <p>Visualize and analyze service area coverage for existing and proposed EIH sites to ensure optimal community access and resource distribution.</p>
         </div>
     </div>
-""", unsafe_allow_html=True)
-if st.button("Launch Coverage Analyzer", key="coverage_button"):
-    st.switch_page("pages/Service_Area.py")
+"""
 
-# Ethical Design Banner
-st.markdown("""
+ETHICS_BANNER_HTML = """
     <div class="ethics-banner">
         <div class="ethics-title">Built with public trust, equity, and inclusion in mind</div>
         <div class="ethics-item">✅ Transparency in data sources and decision-making processes</div>
@@ -152,12 +120,54 @@ st.markdown("""
         <div class="ethics-item">♿ Accessibility considerations for all community members</div>
         <div class="ethics-item">🔒 Privacy-first approach to sensitive information</div>
     </div>
-""", unsafe_allow_html=True)
+"""
 
-# Footer
-st.markdown("""
+FOOTER_HTML = """
     <div class="footer">
         Created by Ankita, Anam, Linh, Ashna, Chaittanya | 
         <a href="https://github.com/Ankita-1004/AISG/tree/1c3f7c6981e4df48967d8d63cce44b2bfa406da8" style="color: #0074b7; text-decoration: none;">GitHub</a>
     </div>
-""", unsafe_allow_html=True) 
+"""
+
+@st.cache_resource
+def load_logo():
+    # Decoded once per process rather than on every rerun; None when the file is missing
+    logo_path = os.path.join(os.path.dirname(__file__), "AISG Logo.png")
+    if not os.path.exists(logo_path):
+        return None
+    logo = Image.open(logo_path)
+    logo.load()
+    return logo
+
+# Custom CSS
+st.markdown(PAGE_CSS, unsafe_allow_html=True)
+
+# Display logo, centred in the middle column
+logo = load_logo()
+if logo is not None:
+    _, logo_col, _ = st.columns([1, 1, 1])
+    logo_col.image(logo, width=300)
+
+# Header Section
+st.markdown(PAGE_HEADER_HTML, unsafe_allow_html=True)
+
+# Feature Cards Section - Two columns for first two features
+col1, col2 = st.columns(2)
+
+with col1:
+    st.markdown(SCORING_CARD_HTML, unsafe_allow_html=True)
+    if st.button("Launch Scoring Model", key="scoring_button"):
+        st.switch_page("pages/Scoring_Model.py")
+
+with col2:
+    st.markdown(FEASIBILITY_CARD_HTML, unsafe_allow_html=True)
+    if st.button("Launch Feasibility Analyzer", key="feasibility_button"):
+        st.switch_page("pages/Build_Feasibility.py")
+
+# Third feature in its own centered column
+st.markdown(COVERAGE_CARD_HTML, unsafe_allow_html=True)
+if st.button("Launch Coverage Analyzer", key="coverage_button"):
+    st.switch_page("pages/Service_Area.py")
+
+# Ethical design banner and footer, as one element
+st.markdown(ETHICS_BANNER_HTML + FOOTER_HTML, unsafe_allow_html=True)
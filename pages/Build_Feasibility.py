@@ -1,350 +1,303 @@
 import streamlit as st
-import pandas as pd
+from dataclasses import dataclass
 import numpy as np
-import plotly.express as px
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut
-import time
 import os
+from utils.geocoding import geocode_address, normalize_address
+from utils.ai import OPENAI_AVAILABLE, get_openai_api_key, get_openai_client, stream_completion
+from utils.cache import open_disk_cache
 
-# Try to import OpenAI, but make it optional
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+if not OPENAI_AVAILABLE:
     st.warning("OpenAI package not available. AI risk assessment will be disabled.")
 
-# Utility functions
-def analyze_feasibility(lat, lon, facility_type, size_sqm):
+# Site types offered in the sidebar; the position doubles as the type id for the score tables
+FACILITY_TYPES = ("Temporary Shelter", "Transitional Housing", "Supportive Housing", "Emergency Shelter")
+FACILITY_TYPE_IDS = {facility_type: i for i, facility_type in enumerate(FACILITY_TYPES)}
+
+# Areas that get special treatment; every other location falls in OTHER_ZONE
+DOWNTOWN_ZONE, RESIDENTIAL_ZONE, OTHER_ZONE = 0, 1, 2
+
+# Bounding box (lat_min, lat_max, lon_min, lon_max) of each special area, in zone id order
+ZONE_BOUNDS = (
+    (37.33, 37.34, -121.89, -121.88),  # Downtown area
+    (37.31, 37.32, -121.85, -121.84)   # Residential area
+)
+ZONE_BOUNDS_ARRAY = np.array(ZONE_BOUNDS)
+
+# Base zoning score indexed by zone, one column per site type
+ZONING_SCORES = (
+    (90, 75, 75, 90),  # Downtown area
+    (45, 65, 65, 45),  # Residential area
+    (80, 80, 80, 80)   # Elsewhere
+)
+
+# Infrastructure score by size bucket (up to 1000 sqm, up to 2000 sqm, larger);
+# larger sites need more infrastructure
+SIZE_BREAKS = (1000, 2000)
+INFRASTRUCTURE_SCORES = (85, 75, 60)
+
+# Temporary shelters often have more flexible zoning; supportive housing needs more infrastructure
+ZONING_ADJUSTMENTS = (1.1, 1.0, 1.0, 1.0)
+INFRASTRUCTURE_ADJUSTMENTS = (1.0, 1.0, 0.9, 1.0)
+
+ZONING_WEIGHT = 0.6
+INFRASTRUCTURE_WEIGHT = 0.4
+
+@dataclass(slots=True, frozen=True)
+class FeasibilityResult:
+    zoning_score: int
+    infrastructure_score: int
+    overall_score: float
+
+def classify_zone(lat, lon):
+    # Classify the site once so scoring and risk assessment agree on the area
+    for zone_id, (lat_min, lat_max, lon_min, lon_max) in enumerate(ZONE_BOUNDS):
+        if lat_min <= lat <= lat_max and lon_min <= lon <= lon_max:
+            return zone_id
+    return OTHER_ZONE
+
+def classify_zones(lats, lons):
+    # Vectorized classify_zone: test every site against every box in one broadcast pass
+    lat_min, lat_max, lon_min, lon_max = ZONE_BOUNDS_ARRAY.T
+    lats = np.asarray(lats, dtype=float)[:, None]
+    lons = np.asarray(lons, dtype=float)[:, None]
+    inside = (lat_min <= lats) & (lats <= lat_max) & (lon_min <= lons) & (lons <= lon_max)
+    # argmax returns the first matching box, so earlier zones win where boxes overlap
+    return np.where(inside.any(axis=1), inside.argmax(axis=1), OTHER_ZONE)
+
+def analyze_feasibility(zone_id, facility_type, size_sqm):
     # Generate dynamic scores based on location and parameters
+    type_id = FACILITY_TYPE_IDS[facility_type]
+
     # Zoning score based on location and facility type
-    if 37.33 <= lat <= 37.34 and -121.89 <= lon <= -121.88:  # Downtown area
-        zoning_score = 90 if facility_type in ["Temporary Shelter", "Emergency Shelter"] else 75
-    elif 37.31 <= lat <= 37.32 and -121.85 <= lon <= -121.84:  # Residential area
-        zoning_score = 65 if facility_type in ["Supportive Housing", "Transitional Housing"] else 45
-    else:
-        zoning_score = 80
-
-    # Infrastructure score based on size and location
-    if size_sqm > 2000:
-        infrastructure_score = 60  # Larger sites need more infrastructure
-    elif size_sqm > 1000:
-        infrastructure_score = 75
-    else:
-        infrastructure_score = 85
-
-    # Adjust scores based on facility type
-    if facility_type == "Temporary Shelter":
-        zoning_score *= 1.1  # Temporary shelters often have more flexible zoning
-    elif facility_type == "Supportive Housing":
-        infrastructure_score *= 0.9  # Supportive housing needs more infrastructure
-
-    # Ensure scores are within 0-100 range
-    zoning_score = min(100, max(0, round(zoning_score)))
-    infrastructure_score = min(100, max(0, round(infrastructure_score)))
+    zoning_score = ZONING_SCORES[zone_id][type_id]
+
+    # Infrastructure score based on size
+    infrastructure_score = INFRASTRUCTURE_SCORES[(size_sqm > SIZE_BREAKS[0]) + (size_sqm > SIZE_BREAKS[1])]
+
+    # Adjust scores based on facility type and keep them within 0-100 range
+    zoning_score = min(100, max(0, round(zoning_score * ZONING_ADJUSTMENTS[type_id])))
+    infrastructure_score = min(100, max(0, round(infrastructure_score * INFRASTRUCTURE_ADJUSTMENTS[type_id])))
     
     # Calculate overall score with weights
-    overall_score = round(0.6 * zoning_score + 0.4 * infrastructure_score, 1)
+    overall_score = round(ZONING_WEIGHT * zoning_score + INFRASTRUCTURE_WEIGHT * infrastructure_score, 1)
+
+    return FeasibilityResult(zoning_score, infrastructure_score, overall_score)
+
+def analyze_feasibility_batch(lats, lons, facility_types, sizes):
+    # Vectorized analyze_feasibility for scoring many sites at once
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    type_ids = np.array([FACILITY_TYPE_IDS[facility_type] for facility_type in facility_types])
+
+    zone_ids = classify_zones(lats, lons)
+    zoning_scores = np.array(ZONING_SCORES)[zone_ids, type_ids] * np.array(ZONING_ADJUSTMENTS)[type_ids]
+    infrastructure_scores = (
+        np.array(INFRASTRUCTURE_SCORES)[np.digitize(sizes, SIZE_BREAKS, right=True)]
+        * np.array(INFRASTRUCTURE_ADJUSTMENTS)[type_ids]
+    )
+    zoning_scores = np.clip(np.round(zoning_scores), 0, 100).astype(int)
+    infrastructure_scores = np.clip(np.round(infrastructure_scores), 0, 100).astype(int)
+    overall_scores = np.round(ZONING_WEIGHT * zoning_scores + INFRASTRUCTURE_WEIGHT * infrastructure_scores, 1)
 
     return {
-        'zoning_score': zoning_score,
-        'infrastructure_score': infrastructure_score,
-        'overall_score': overall_score
+        'zoning_score': zoning_scores,
+        'infrastructure_score': infrastructure_scores,
+        'overall_score': overall_scores
     }
 
-def get_zoning_interpretation(score):
-    if score >= 90:
-        return "Excellent zoning compatibility"
-    elif score >= 80:
-        return "Good zoning compatibility with minor considerations"
-    elif score >= 70:
-        return "Moderate zoning challenges"
-    elif score >= 60:
-        return "Significant zoning challenges"
-    else:
-        return "Major zoning obstacles"
-
-def get_infrastructure_interpretation(score):
-    if score >= 90:
-        return "Excellent infrastructure conditions"
-    elif score >= 80:
-        return "Good infrastructure with minor upgrades needed"
-    elif score >= 70:
-        return "Moderate infrastructure improvements required"
-    elif score >= 60:
-        return "Significant infrastructure upgrades needed"
-    else:
-        return "Major infrastructure challenges"
-
-def get_overall_interpretation(score):
-    if score >= 90:
-        return "Highly feasible site"
-    elif score >= 80:
-        return "Good feasibility with manageable challenges"
-    elif score >= 70:
-        return "Moderate feasibility with significant considerations"
-    elif score >= 60:
-        return "Challenging but potentially feasible"
-    else:
-        return "Major feasibility concerns"
+# Score interpretations, indexed by score bucket: below 60, 60s, 70s, 80s, 90 and above
+ZONING_INTERPRETATIONS = (
+    "Major zoning obstacles",
+    "Significant zoning challenges",
+    "Moderate zoning challenges",
+    "Good zoning compatibility with minor considerations",
+    "Excellent zoning compatibility"
+)
+INFRASTRUCTURE_INTERPRETATIONS = (
+    "Major infrastructure challenges",
+    "Significant infrastructure upgrades needed",
+    "Moderate infrastructure improvements required",
+    "Good infrastructure with minor upgrades needed",
+    "Excellent infrastructure conditions"
+)
+OVERALL_INTERPRETATIONS = (
+    "Major feasibility concerns",
+    "Challenging but potentially feasible",
+    "Moderate feasibility with significant considerations",
+    "Good feasibility with manageable challenges",
+    "Highly feasible site"
+)
+
+def score_bucket(score):
+    # Count the thresholds the score clears instead of walking an if/elif ladder
+    return (score >= 60) + (score >= 70) + (score >= 80) + (score >= 90)
 
-def generate_report(results):
-    return f"""
+REPORT_TEMPLATE = """
     <p><strong>Feasibility Analysis Report</strong></p>
-    <p>• Zoning Score: {results['zoning_score']}/100</p>
-    <p>• Infrastructure Score: {results['infrastructure_score']}/100</p>
-    <p>• Overall Feasibility: {results['overall_score']}/100</p>
+    <p>• Zoning Score: {zoning}/100</p>
+    <p>• Infrastructure Score: {infrastructure}/100</p>
+    <p>• Overall Feasibility: {overall}/100</p>
     <p><strong>Score Interpretation:</strong></p>
     <ul>
-        <li>Zoning Score: {get_zoning_interpretation(results['zoning_score'])}</li>
-        <li>Infrastructure Score: {get_infrastructure_interpretation(results['infrastructure_score'])}</li>
-        <li>Overall Feasibility: {get_overall_interpretation(results['overall_score'])}</li>
+        <li>Zoning Score: {zoning_note}</li>
+        <li>Infrastructure Score: {infrastructure_note}</li>
+        <li>Overall Feasibility: {overall_note}</li>
     </ul>
     """
 
-def generate_risk_assessment(lat, lon, facility_type, size_sqm, results):
-    # Generate dynamic risks based on actual scores and location
-    risks = {
-        'zoning_challenges': [],
-        'construction_risks': [],
-        'political_sensitivities': [],
-        'environmental_flags': []
-    }
-    
-    # Zoning Challenges based on zoning score
-    if results['zoning_score'] < 70:
-        risks['zoning_challenges'].append("High risk of zoning conflicts - may require extensive variance process")
-    elif results['zoning_score'] < 85:
-        risks['zoning_challenges'].append("Moderate zoning challenges - conditional use permit likely required")
-    else:
-        risks['zoning_challenges'].append("Zoning appears favorable, but standard permits still required")
-    
-    # Construction Risks based on infrastructure score
-    if results['infrastructure_score'] < 60:
-        risks['construction_risks'].extend([
-            "Significant infrastructure upgrades needed",
-            "Potential soil stability issues",
-            "Drainage system may require major modifications"
-        ])
-    elif results['infrastructure_score'] < 80:
-        risks['construction_risks'].extend([
-            "Moderate infrastructure improvements needed",
-            "Some site grading may be required",
-            "Utility connections may need upgrades"
-        ])
-    else:
-        risks['construction_risks'].append("Infrastructure appears adequate for development")
-    
-    # Political Sensitivities based on location
-    if 37.33 <= lat <= 37.34 and -121.89 <= lon <= -121.88:  # Downtown area
-        risks['political_sensitivities'].extend([
-            "High visibility location - increased community engagement needed",
-            "Multiple stakeholders in the area",
-            "Historic district considerations"
-        ])
-    elif 37.31 <= lat <= 37.32 and -121.85 <= lon <= -121.84:  # Residential area
-        risks['political_sensitivities'].extend([
-            "Active neighborhood association in area",
-            "School proximity considerations",
-            "Residential density concerns"
-        ])
-    else:
-        risks['political_sensitivities'].append("Standard community engagement process required")
-    
-    # Environmental Flags based on size and type
-    if size_sqm > 2000:
-        risks['environmental_flags'].extend([
-            "Large site - comprehensive environmental review required",
-            "Stormwater management plan needed",
-            "Potential habitat impact assessment required"
-        ])
-    elif size_sqm > 1000:
-        risks['environmental_flags'].extend([
-            "Moderate environmental review required",
-            "Basic stormwater management needed",
-            "Site-specific environmental considerations"
-        ])
-    else:
-        risks['environmental_flags'].append("Standard environmental review process")
-    
-    # Add facility type specific risks
-    if facility_type == "Temporary Shelter":
-        risks['zoning_challenges'].append("Temporary use permits may be required")
-    elif facility_type == "Supportive Housing":
-        risks['zoning_challenges'].append("Permanent housing zoning requirements apply")
-    
-    return risks
+def generate_report(results):
+    # Look up all three interpretations inline and fill the report in one format call
+    return REPORT_TEMPLATE.format(
+        zoning=results.zoning_score,
+        infrastructure=results.infrastructure_score,
+        overall=results.overall_score,
+        zoning_note=ZONING_INTERPRETATIONS[score_bucket(results.zoning_score)],
+        infrastructure_note=INFRASTRUCTURE_INTERPRETATIONS[score_bucket(results.infrastructure_score)],
+        overall_note=OVERALL_INTERPRETATIONS[score_bucket(results.overall_score)]
+    )
 
-# Set page config
-st.set_page_config(
-    page_title="EIH Build Feasibility",
-    page_icon="🏗️",
-    layout="wide"
-)
+# Risk messages per category, selected by score, location and size bucket
+ZONING_HIGH_RISKS = ("High risk of zoning conflicts - may require extensive variance process",)
+ZONING_MODERATE_RISKS = ("Moderate zoning challenges - conditional use permit likely required",)
+ZONING_LOW_RISKS = ("Zoning appears favorable, but standard permits still required",)
 
-# Custom CSS
-st.markdown("""
-    <style>
-    .main {
-        padding: 2rem;
-    }
-    .header {
-        color: #003b73;
-        font-size: 2rem;
-        font-weight: bold;
-        margin-bottom: 1rem;
-    }
-    .subheader {
-        color: #60a3d9;
-        font-size: 1.2rem;
-        margin-bottom: 2rem;
-    }
-    .metric-card {
-        background-color: #bfd7ed;
-        padding: 1.5rem;
-        border-radius: 10px;
-        margin-bottom: 1rem;
-    }
-    .metric-title {
-        color: #0074b7;
-        font-size: 1.2rem;
-        margin-bottom: 0.5rem;
-    }
-    .sidebar .sidebar-content {
-        background-color: #f8f9fa;
-    }
-    .example-card {
-        background-color: #f8f9fa;
-        padding: 1rem;
-        border-radius: 5px;
-        margin: 1rem 0;
-        border-left: 4px solid #60a3d9;
-    }
-    .risk-card {
-        background-color: #fff;
-        padding: 1.5rem;
-        border-radius: 10px;
-        margin-bottom: 1rem;
-        border-left: 4px solid #ff6b6b;
-    }
-    .risk-title {
-        color: #ff6b6b;
-        font-size: 1.2rem;
-        margin-bottom: 0.5rem;
-    }
-    .risk-level {
-        display: inline-block;
-        padding: 0.25rem 0.5rem;
-        border-radius: 4px;
-        font-size: 0.8rem;
-        font-weight: bold;
-        margin-left: 0.5rem;
-    }
-    .risk-high {
-        background-color: #ff6b6b;
-        color: white;
-    }
-    .risk-medium {
-        background-color: #ffd93d;
-        color: black;
-    }
-    .risk-low {
-        background-color: #6bff6b;
-        color: black;
-    }
-    </style>
-""", unsafe_allow_html=True)
+CONSTRUCTION_HIGH_RISKS = (
+    "Significant infrastructure upgrades needed",
+    "Potential soil stability issues",
+    "Drainage system may require major modifications"
+)
+CONSTRUCTION_MODERATE_RISKS = (
+    "Moderate infrastructure improvements needed",
+    "Some site grading may be required",
+    "Utility connections may need upgrades"
+)
+CONSTRUCTION_LOW_RISKS = ("Infrastructure appears adequate for development",)
 
-# Header
-st.markdown('<div class="header">EIH Build Feasibility Analyzer</div>', unsafe_allow_html=True)
-st.markdown('<div class="subheader">Analyze the feasibility of establishing Emergency Interim Housing sites</div>', unsafe_allow_html=True)
+# Indexed by zone
+POLITICAL_RISKS = (
+    (
+        "High visibility location - increased community engagement needed",
+        "Multiple stakeholders in the area",
+        "Historic district considerations"
+    ),
+    (
+        "Active neighborhood association in area",
+        "School proximity considerations",
+        "Residential density concerns"
+    ),
+    ("Standard community engagement process required",)
+)
 
-# Example section
-st.markdown("""
-    <div class="example-card">
-        <h4>📋 Example Addresses</h4>
-        <p>Try these San Jose addresses for testing:</p>
-        <ul>
-            <li>"200 E Santa Clara St, San Jose, CA 95113" (Downtown)</li>
-            <li>"635 Phelan Ave, San Jose, CA 95112" (East Side)</li>
-            <li>"1500 S 10th St, San Jose, CA 95112" (Central)</li>
-        </ul>
-    </div>
-""", unsafe_allow_html=True)
+LARGE_SITE_ENVIRONMENTAL_FLAGS = (
+    "Large site - comprehensive environmental review required",
+    "Stormwater management plan needed",
+    "Potential habitat impact assessment required"
+)
+MEDIUM_SITE_ENVIRONMENTAL_FLAGS = (
+    "Moderate environmental review required",
+    "Basic stormwater management needed",
+    "Site-specific environmental considerations"
+)
+SMALL_SITE_ENVIRONMENTAL_FLAGS = ("Standard environmental review process",)
 
-# Input parameters in sidebar
-st.sidebar.markdown('<div class="metric-title">Analysis Parameters</div>', unsafe_allow_html=True)
+FACILITY_ZONING_RISKS = {
+    "Temporary Shelter": ("Temporary use permits may be required",),
+    "Supportive Housing": ("Permanent housing zoning requirements apply",)
+}
 
-# Location inputs
-st.sidebar.markdown("### Location")
-address = st.sidebar.text_input("Site Address", "200 E Santa Clara St, San Jose, CA 95113")
+# Risk tables indexed by bucket, highest risk first for scores and smallest site first for size.
+# A bucket is the number of breaks the value clears, as in score_bucket.
+ZONING_RISK_BREAKS = (70, 85)
+CONSTRUCTION_RISK_BREAKS = (60, 80)
 
-# Facility parameters
-st.sidebar.markdown("### EIH Site Details")
-facility_type = st.sidebar.selectbox(
-    "Site Type",
-    ["Temporary Shelter", "Transitional Housing", "Supportive Housing", "Emergency Shelter"]
+# Zoning risks per bucket with the site type specific risks already appended
+ZONING_RISKS = tuple(
+    {facility_type: level + FACILITY_ZONING_RISKS.get(facility_type, ()) for facility_type in FACILITY_TYPES}
+    for level in (ZONING_HIGH_RISKS, ZONING_MODERATE_RISKS, ZONING_LOW_RISKS)
 )
+CONSTRUCTION_RISKS = (CONSTRUCTION_HIGH_RISKS, CONSTRUCTION_MODERATE_RISKS, CONSTRUCTION_LOW_RISKS)
+ENVIRONMENTAL_FLAGS = (SMALL_SITE_ENVIRONMENTAL_FLAGS, MEDIUM_SITE_ENVIRONMENTAL_FLAGS, LARGE_SITE_ENVIRONMENTAL_FLAGS)
+
+# Display titles for the risk categories returned by generate_risk_assessment
+RISK_TITLES = {
+    'zoning_challenges': "Zoning Challenges",
+    'construction_risks': "Construction Risks",
+    'political_sensitivities': "Political Sensitivities",
+    'environmental_flags': "Environmental Flags"
+}
+
+def generate_risk_assessment(zone_id, facility_type, size_sqm, results):
+    # Generate dynamic risks based on actual scores and location; each category is one table lookup
+    zoning_bucket = (results.zoning_score >= ZONING_RISK_BREAKS[0]) + (results.zoning_score >= ZONING_RISK_BREAKS[1])
+    construction_bucket = (
+        (results.infrastructure_score >= CONSTRUCTION_RISK_BREAKS[0])
+        + (results.infrastructure_score >= CONSTRUCTION_RISK_BREAKS[1])
+    )
+    size_bucket = (size_sqm > SIZE_BREAKS[0]) + (size_sqm > SIZE_BREAKS[1])
+
+    return {
+        'zoning_challenges': ZONING_RISKS[zoning_bucket][facility_type],
+        'construction_risks': CONSTRUCTION_RISKS[construction_bucket],
+        'political_sensitivities': POLITICAL_RISKS[zone_id],
+        'environmental_flags': ENVIRONMENTAL_FLAGS[size_bucket]
+    }
 
-size_sqm = st.sidebar.number_input("Proposed Size (sqm)", min_value=100, value=1000)
+# HTML templates for the result cards
+METRIC_CARD_TEMPLATE = (
+    '<div class="metric-card">'
+    '<div class="metric-title">{title}</div>'
+    '<div style="font-size: 2rem; color: #003b73;">{value:.1f}/100</div>'
+    '</div>'
+)
+METRIC_CARDS = (
+    ("Zoning Score", 'zoning_score'),
+    ("Infrastructure Score", 'infrastructure_score'),
+    ("Overall Feasibility", 'overall_score')
+)
+# Items are joined with '</li><li>', so the template supplies the outer tags; every risk tuple is non-empty
+RISK_CARD_TEMPLATE = '<div class="risk-card"><div class="risk-title">{title}</div><ul><li>{items}</li></ul></div>'
+AI_ANALYSIS_TEMPLATE = """
+    <div class="metric-card">
+        <div class="metric-title">AI Risk Analysis</div>
+        <div style="padding: 1rem;">
+            {}
+        </div>
+    </div>
+"""
 
-# Analysis button
-if st.sidebar.button("Analyze Feasibility", type="primary"):
+def render_analysis(address, facility_type, size_sqm):
     try:
-        # Geocode address with retry mechanism
-        geolocator = Nominatim(user_agent="eih_analyzer", timeout=10)
-        max_retries = 3
-        retry_delay = 2  # seconds
-        
-        for attempt in range(max_retries):
-            try:
-                location = geolocator.geocode(address)
-                if location:
-                    break
-            except GeocoderTimedOut:
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay)
-                    continue
-                else:
-                    raise Exception("Geocoding service timed out after multiple attempts. Please try again later.")
+        # Resubmitting the same inputs reuses the last analysis, including its AI text
+        key = (address, facility_type, size_sqm)
+        last = st.session_state.get("last_analysis")
+        if last is not None and last["key"] == key:
+            coords = last["coords"]
+        else:
+            last = None
+            # Geocode address (cached across reruns and sessions)
+            coords = geocode_address(address)
         
-        if location:
-            latitude = location.latitude
-            longitude = location.longitude
+        if coords:
+            latitude, longitude = coords
             
             # Perform analysis
-            results = analyze_feasibility(latitude, longitude, facility_type, size_sqm)
+            if last is None:
+                zone_id = classify_zone(latitude, longitude)
+                results = analyze_feasibility(zone_id, facility_type, size_sqm)
+                risks = generate_risk_assessment(zone_id, facility_type, size_sqm, results)
+                last = st.session_state["last_analysis"] = {
+                    "key": key, "coords": coords, "results": results, "risks": risks, "ai_analysis": None
+                }
+            results, risks = last["results"], last["risks"]
             
             # Display results
             st.markdown('<div class="metric-title">Feasibility Analysis Results</div>', unsafe_allow_html=True)
             
-            # Create columns for metrics
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.markdown("""
-                    <div class="metric-card">
-                        <div class="metric-title">Zoning Score</div>
-                        <div style="font-size: 2rem; color: #003b73;">{:.1f}/100</div>
-                    </div>
-                """.format(results['zoning_score']), unsafe_allow_html=True)
-            
-            with col2:
-                st.markdown("""
-                    <div class="metric-card">
-                        <div class="metric-title">Infrastructure Score</div>
-                        <div style="font-size: 2rem; color: #003b73;">{:.1f}/100</div>
-                    </div>
-                """.format(results['infrastructure_score']), unsafe_allow_html=True)
-            
-            with col3:
-                st.markdown("""
-                    <div class="metric-card">
-                        <div class="metric-title">Overall Feasibility</div>
-                        <div style="font-size: 2rem; color: #003b73;">{:.1f}/100</div>
-                    </div>
-                """.format(results['overall_score']), unsafe_allow_html=True)
+            # Render all metric cards as one grid element
+            metric_cards = ''.join(
+                METRIC_CARD_TEMPLATE.format(title=title, value=getattr(results, field)) for title, field in METRIC_CARDS
+            )
+            st.markdown(f'<div class="metric-grid">{metric_cards}</div>', unsafe_allow_html=True)
             
             # Generate and display detailed report
             st.markdown('<div class="metric-title">Detailed Analysis</div>', unsafe_allow_html=True)
@@ -357,71 +310,187 @@ if st.sidebar.button("Analyze Feasibility", type="primary"):
 
             # Generate and display risk assessment
             st.markdown('<div class="metric-title">Site Risk Assessment</div>', unsafe_allow_html=True)
-            risks = generate_risk_assessment(latitude, longitude, facility_type, size_sqm, results)
             
-            # Display each risk category
-            for category, risk_list in risks.items():
-                category_title = category.replace('_', ' ').title()
-                st.markdown(f"""
-                    <div class="risk-card">
-                        <div class="risk-title">{category_title}</div>
-                        <ul>
-                            {''.join(f'<li>{risk}</li>' for risk in risk_list)}
-                        </ul>
-                    </div>
-                """, unsafe_allow_html=True)
+            # Display every risk category in a single element
+            risk_cards = ''.join(
+                RISK_CARD_TEMPLATE.format(
+                    title=RISK_TITLES[category],
+                    items='</li><li>'.join(risk_list)
+                )
+                for category, risk_list in risks.items()
+            )
+            st.markdown(risk_cards, unsafe_allow_html=True)
 
             # AI Risk Analysis
-            if OPENAI_AVAILABLE and 'client' in locals():
+            # Every input that shapes the prompt is part of the key, so scoring changes invalidate it
+            ai_key = (
+                normalize_address(address), facility_type, size_sqm,
+                results.zoning_score, results.infrastructure_score, results.overall_score
+            )
+            # Finished analyses are kept on disk and shared across sessions so identical prompts are not billed twice
+            ai_store = open_disk_cache(".ai_analysis_cache") if client else None
+            if ai_store is not None and last["ai_analysis"] is None:
+                last["ai_analysis"] = ai_store.get(ai_key)
+
+            if client and last["ai_analysis"] is not None:
                 st.markdown('<div class="metric-title">AI Risk Analysis</div>', unsafe_allow_html=True)
-                with st.spinner("Analyzing potential risks..."):
-                    try:
-                        response = client.chat.completions.create(
-                            model="gpt-3.5-turbo",
-                            messages=[
-                                {
-                                    "role": "system",
-                                    "content": (
-                                        "You are an expert in Emergency Interim Housing (EIH) site assessment and risk analysis. "
-                                        "Analyze the following site data and provide a comprehensive risk assessment focusing on:"
-                                        "\n• Zoning and regulatory challenges"
-                                        "\n• Construction and environmental risks"
-                                        "\n• Community and political considerations"
-                                        "\n• Mitigation strategies"
-                                        "\nBe specific and practical in your recommendations."
-                                    )
-                                },
-                                {
-                                    "role": "user",
-                                    "content": f"""
-                                    Site Details:
-                                    - Type: {facility_type}
-                                    - Size: {size_sqm} sqm
-                                    - Location: {address}
-                                    - Zoning Score: {results['zoning_score']}
-                                    - Infrastructure Score: {results['infrastructure_score']}
-                                    - Overall Feasibility: {results['overall_score']}
-                                    
-                                    Please provide a detailed risk assessment and recommendations.
-                                    """
-                                }
-                            ]
-                        )
-                        st.markdown("""
-                            <div class="metric-card">
-                                <div class="metric-title">AI Risk Analysis</div>
-                                <div style="padding: 1rem;">
-                                    {}
-                                </div>
-                            </div>
-                        """.format(response.choices[0].message.content), unsafe_allow_html=True)
-                    except Exception as e:
-                        st.error(f"Error generating AI risk analysis: {str(e)}")
+                st.markdown(AI_ANALYSIS_TEMPLATE.format(last["ai_analysis"]), unsafe_allow_html=True)
+            elif client:
+                st.markdown('<div class="metric-title">AI Risk Analysis</div>', unsafe_allow_html=True)
+                try:
+                    messages = [
+                        {
+                            "role": "system",
+                            "content": (
+                                "You are an expert in Emergency Interim Housing (EIH) site assessment and risk analysis. "
+                                "Analyze the following site data and provide a comprehensive risk assessment focusing on:"
+                                "\n• Zoning and regulatory challenges"
+                                "\n• Construction and environmental risks"
+                                "\n• Community and political considerations"
+                                "\n• Mitigation strategies"
+                                "\nBe specific and practical in your recommendations."
+                            )
+                        },
+                        {
+                            "role": "user",
+                            "content": f"""
+                            Site Details:
+                            - Type: {facility_type}
+                            - Size: {size_sqm} sqm
+                            - Location: {address}
+                            - Zoning Score: {results.zoning_score}
+                            - Infrastructure Score: {results.infrastructure_score}
+                            - Overall Feasibility: {results.overall_score}
+                            
+                            Please provide a detailed risk assessment and recommendations.
+                            """
+                        }
+                    ]
+                    analysis = stream_completion(
+                        client, "gpt-3.5-turbo", messages, st.empty(), AI_ANALYSIS_TEMPLATE, "Analyzing potential risks..."
+                    )
+                    last["ai_analysis"] = analysis
+                    if ai_store is not None:
+                        ai_store.set(ai_key, analysis, expire=7 * 86400)
+                except Exception as e:
+                    st.error(f"Error generating AI risk analysis: {str(e)}")
             
         else:
             st.error("Could not find the specified address. Please check the address and try again.")
         
     except Exception as e:
         st.error(f"Error during analysis: {str(e)}")
+
+def render_site_comparison(addresses, facility_type, size_sqm):
+    try:
+        # Geocode every site, keeping track of the ones that can't be found
+        found, missing = [], []
+        for site_address in addresses:
+            # A failed lookup only drops that site; the rest of the comparison still runs
+            try:
+                coords = geocode_address(site_address)
+            except Exception:
+                coords = None
+            if coords:
+                found.append((site_address, *coords))
+            else:
+                missing.append(site_address)
+
+        if missing:
+            st.warning("Could not find: " + "; ".join(missing))
+
+        if found:
+            site_addresses, lats, lons = zip(*found)
+            results = analyze_feasibility_batch(lats, lons, [facility_type] * len(found), [size_sqm] * len(found))
+
+            # Rank sites by overall feasibility
+            order = np.argsort(-results['overall_score'], kind="stable")
+            st.markdown('<div class="metric-title">Site Comparison</div>', unsafe_allow_html=True)
+            st.dataframe({
+                "Address": [site_addresses[i] for i in order],
+                "Zoning Score": results['zoning_score'][order],
+                "Infrastructure Score": results['infrastructure_score'][order],
+                "Overall Feasibility": results['overall_score'][order]
+            }, hide_index=True, use_container_width=True)
+
+    except Exception as e:
+        st.error(f"Error during comparison: {str(e)}")
+
+# Static page content
+@st.cache_data(show_spinner=False)
+def load_page_css():
+    # Read the stylesheet once per server process and collapse it to one line; the indent matches
+    # the HTML constants it is sent with so the markdown dedent keeps them all as raw HTML
+    with open(os.path.join(os.path.dirname(__file__), os.pardir, "styles", "build_feasibility.css")) as f:
+        return "    <style>" + " ".join(f.read().split()) + "</style>\n"
+
+PAGE_HEADER_HTML = """
+    <div class="header">EIH Build Feasibility Analyzer</div>
+    <div class="subheader">Analyze the feasibility of establishing Emergency Interim Housing sites</div>
+"""
+
+EXAMPLE_CARD_HTML = """
+    <div class="example-card">
+        <h4>📋 Example Addresses</h4>
+        <p>Try these San Jose addresses for testing:</p>
+        <ul>
+            <li>"200 E Santa Clara St, San Jose, CA 95113" (Downtown)</li>
+            <li>"635 Phelan Ave, San Jose, CA 95112" (East Side)</li>
+            <li>"1500 S 10th St, San Jose, CA 95112" (Central)</li>
+        </ul>
+    </div>
+"""
+
+# Set page config
+st.set_page_config(
+    page_title="EIH Build Feasibility",
+    page_icon="🏗️",
+    layout="wide"
+)
+
+# The AI risk panel appears only when the openai package and an API key are both present; otherwise it is left out quietly
+client = None
+if OPENAI_AVAILABLE:
+    try:
+        api_key = get_openai_api_key()
+        if api_key:
+            client = get_openai_client(api_key)
+    except Exception as e:
+        st.warning(f"Error initializing OpenAI client: {str(e)}. AI risk assessment will be disabled.")
+
+# Custom CSS, header and example section, sent as one element
+st.markdown(load_page_css() + PAGE_HEADER_HTML + EXAMPLE_CARD_HTML, unsafe_allow_html=True)
+
+# Input parameters in sidebar
+st.sidebar.markdown('<div class="metric-title">Analysis Parameters</div>', unsafe_allow_html=True)
+
+# Inputs live in a form so editing them doesn't rerun the page until the analysis is requested
+with st.sidebar.form("analysis_parameters"):
+    # Location inputs
+    st.markdown("### Location")
+    address = st.text_input("Site Address", "200 E Santa Clara St, San Jose, CA 95113")
+
+    # Facility parameters
+    st.markdown("### EIH Site Details")
+    facility_type = st.selectbox("Site Type", FACILITY_TYPES)
+
+    size_sqm = st.number_input("Proposed Size (sqm)", min_value=100, value=1000)
+
+    # Several sites can be ranked side by side using the same site details
+    st.markdown("### Compare Sites")
+    compare_addresses = st.text_area(
+        "Site Addresses (one per line)",
+        "200 E Santa Clara St, San Jose, CA 95113\n635 Phelan Ave, San Jose, CA 95112\n1500 S 10th St, San Jose, CA 95112"
+    )
+
+    submitted = st.form_submit_button("Analyze Feasibility", type="primary")
+    compare_submitted = st.form_submit_button("Compare Sites")
+
+# Analysis buttons
+if submitted:
+    render_analysis(address, facility_type, size_sqm)
+elif compare_submitted:
+    compare_list = [line.strip() for line in compare_addresses.splitlines() if line.strip()]
+    render_site_comparison(compare_list, facility_type, size_sqm)
 else:
     st.info("Please enter the site address and parameters in the sidebar to begin analysis.") 
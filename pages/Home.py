@@ -1,12 +1,9 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
 from PIL import Image
 import os
 
-# Custom CSS
-st.markdown("""
+# Static page content
+PAGE_CSS = """
     <style>
     .main {
         padding: 2rem;
@@ -58,13 +55,6 @@ st.markdown("""
         background-color: #0074b7;
         color: white;
     }
-    .logo-container {
-        width: 100%;
-        display: flex;
-        justify-content: center;
-        align-items: center;
-        margin: 0 auto 2rem auto;
-    }
     .logo {
         max-width: 300px;
         height: auto;
@@ -79,45 +69,30 @@ st.markdown("""
         margin-top: 2rem;
     }
     </style>
-""", unsafe_allow_html=True)
-
-# Load and display logo
-logo_path = "../AISG Logo.png"
-if os.path.exists(logo_path):
-    logo = Image.open(logo_path)
-    st.markdown('<div class="logo-container">', unsafe_allow_html=True)
-    st.image(logo, width=300, use_container_width=False)
-    st.markdown('</div>', unsafe_allow_html=True)
+"""
 
-# Header Section
-st.markdown("""
+PAGE_HEADER_HTML = """
     <div class="header">PlaceWell: Smarter EIH Site Planning for San Jose</div>
     <div class="subtitle">A data-driven platform for equitable and feasible Emergency Interim Housing placement</div>
-""", unsafe_allow_html=True)
+"""
 
-# Feature Cards Section - Two columns for first two features
-col1, col2 = st.columns(2)
-
-with col1:
-    st.markdown("""
+SCORING_CARD_HTML = """
         <div class="feature-card">
             <div class="feature-title">📊 Scoring Model</div>
             <p>Evaluate potential EIH locations using our comprehensive scoring system that considers multiple factors including population needs, accessibility, and community impact.</p>
             <a href="/Scoring_Model" class="feature-button">Launch Scoring Model</a>
         </div>
-    """, unsafe_allow_html=True)
+"""
 
-with col2:
-    st.markdown("""
+FEASIBILITY_CARD_HTML = """
         <div class="feature-card">
             <div class="feature-title">🏗️ Build Feasibility Analyzer</div>
             <p>Analyze the feasibility of establishing EIH sites by considering zoning regulations, land availability, and infrastructure requirements.</p>
             <a href="/Build_Feasibility" class="feature-button">Launch Feasibility Analyzer</a>
         </div>
-    """, unsafe_allow_html=True)
+"""
 
-# Third feature in its own centered column
-st.markdown("""
+COVERAGE_CARD_HTML = """
     <div style="max-width: 600px; margin: 0 auto;">
         <div class="feature-card">
             <div class="feature-title">🗺️ Service Area Coverage</div>
@@ -125,10 +100,9 @@ st.markdown("""
             <a href="/Service_Area" class="feature-button">Launch Coverage Analyzer</a>
         </div>
     </div>
-""", unsafe_allow_html=True)
+"""
 
-# Ethical Design Banner
-st.markdown("""
+ETHICS_BANNER_HTML = """
     <div class="ethics-banner">
         <div class="ethics-title">Built with public trust, equity, and inclusion in mind</div>
         <div class="ethics-item">✅ Transparency in data sources and decision-making processes</div>
@@ -136,12 +110,45 @@ st.markdown("""
         <div class="ethics-item">♿ Accessibility considerations for all community members</div>
         <div class="ethics-item">🔒 Privacy-first approach to sensitive information</div>
     </div>
-""", unsafe_allow_html=True)
+"""
 
-# Footer
-st.markdown("""
+FOOTER_HTML = """
     <div class="footer">
         Created by Team Violet | 
         <a href="https://github.com/Ankita-1004/AISG/tree/1c3f7c6981e4df48967d8d63cce44b2bfa406da8" style="color: #0074b7; text-decoration: none;">GitHub</a>
     </div>
-""", unsafe_allow_html=True) 
\ No newline at end of file
+"""
+
+@st.cache_resource
+def load_logo():
+    # Decoded once per process rather than on every rerun; None when the file is missing
+    logo_path = os.path.join(os.path.dirname(__file__), os.pardir, "AISG Logo.png")
+    if not os.path.exists(logo_path):
+        return None
+    logo = Image.open(logo_path)
+    logo.load()
+    return logo
+
+# Custom CSS
+st.markdown(PAGE_CSS, unsafe_allow_html=True)
+
+# Display logo, centred in the middle column
+logo = load_logo()
+if logo is not None:
+    _, logo_col, _ = st.columns([1, 1, 1])
+    logo_col.image(logo, width=300)
+
+# Header Section
+st.markdown(PAGE_HEADER_HTML, unsafe_allow_html=True)
+
+# Feature Cards Section - Two columns for first two features
+col1, col2 = st.columns(2)
+
+with col1:
+    st.markdown(SCORING_CARD_HTML, unsafe_allow_html=True)
+
+with col2:
+    st.markdown(FEASIBILITY_CARD_HTML, unsafe_allow_html=True)
+
+# Third feature in its own centered column, then the ethical design banner and footer, as one element
+st.markdown(COVERAGE_CARD_HTML + ETHICS_BANNER_HTML + FOOTER_HTML, unsafe_allow_html=True)
@@ -2,29 +2,16 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-import math
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut
-import time
-import os
+from utils.geocoding import geocode_address
+from utils.scoring import SiteScorer
+from utils.ai import OPENAI_AVAILABLE, get_openai_api_key, get_openai_client, stream_completion
+from utils.cache import open_disk_cache
 
-# Try to import OpenAI, but make it optional
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+if not OPENAI_AVAILABLE:
     st.warning("OpenAI package not available. AI chatbox will be disabled.")
 
-# Set page config
-st.set_page_config(
-    page_title="EIH Scoring Model",
-    page_icon="📊",
-    layout="wide"
-)
-
-# Custom CSS
-st.markdown("""
+# Static page content
+PAGE_CSS = """
     <style>
     .main {
         padding: 2rem;
@@ -40,6 +27,11 @@ st.markdown("""
         font-size: 1.2rem;
         margin-bottom: 2rem;
     }
+    .metric-grid {
+        display: grid;
+        grid-template-columns: repeat(4, 1fr);
+        gap: 1rem;
+    }
     .metric-card {
         background-color: #bfd7ed;
         padding: 1.5rem;
@@ -66,13 +58,100 @@ st.markdown("""
         border-left: 4px solid #60a3d9;
     }
     </style>
-""", unsafe_allow_html=True)
+"""
+
+PAGE_HEADER_HTML = """
+    <div class="header">EIH Location Scoring Model</div>
+    <div class="subheader">Evaluate potential Emergency Interim Housing locations using our comprehensive scoring system</div>
+"""
+
+EXAMPLE_CARD_HTML = """
+    <div class="example-card">
+        <h4>📋 Example Addresses</h4>
+        <p>Try these San Jose addresses for testing:</p>
+        <ul>
+            <li>"200 E Santa Clara St, San Jose, CA 95113" (Downtown)</li>
+            <li>"635 Phelan Ave, San Jose, CA 95112" (East Side)</li>
+            <li>"1500 S 10th St, San Jose, CA 95112" (Central)</li>
+        </ul>
+    </div>
+"""
+
+PIA_MODEL = "gpt-3.5-turbo"
+PIA_SYSTEM_PROMPT = (
+    "You are Pia, an experienced Emergency Interim Housing (EIH) specialist with over 15 years of experience in housing policy and urban planning. "
+    "You have a deep understanding of the challenges faced by unhoused communities and the importance of thoughtful site selection. "
+    "Your responses should be:"
+    "\n• Professional yet approachable"
+    "\n• Focused on practical insights and real-world implications"
+    "\n• Informed by your experience working with unhoused communities"
+    "\n• Clear about how different factors affect site suitability"
+    "\n• Empathetic to the needs of both unhoused individuals and surrounding communities"
+    "\nWhen explaining scores or factors, relate them to real-world impacts and community needs."
+)
+
+PIA_RESPONSE_TEMPLATE = """
+    <div class="metric-card">
+        <div class="metric-title">Pia's Response</div>
+        <div style="padding: 1rem;">
+            {}
+        </div>
+    </div>
+"""
+
+# Result card markup; scores are passed in on the 0-100 scale
+METRIC_CARD_TEMPLATE = (
+    '<div class="metric-card">'
+    '<div class="metric-title">{title}</div>'
+    '<div style="font-size: 2rem; color: #003b73;">{value:.1f}/100</div>'
+    '</div>'
+)
+
+# Set page config
+st.set_page_config(
+    page_title="EIH Scoring Model",
+    page_icon="📊",
+    layout="wide"
+)
+
+# Load data once per server process; the frames are treated as read-only
+@st.cache_data(show_spinner=False)
+def load_data():
+    # Only the columns scoring reads, with declared dtypes so pandas skips type inference.
+    # Counts fit in int32; coordinates and rates stay float64 since float32 rounding can tip the 3 km and nearest-tract cut-offs
+    census_df = pd.read_csv(
+        "data sets/mock_census_tracts_sanjose.csv",
+        usecols=['Tract ID', 'Unhoused Count', 'Poverty Rate (%)', 'Latitude', 'Longitude'],
+        dtype={'Tract ID': 'int64', 'Unhoused Count': 'int32', 'Poverty Rate (%)': 'float64', 'Latitude': 'float64', 'Longitude': 'float64'}
+    )
+    shelters_df = pd.read_csv(
+        "data sets/mock_shelters_sanjose.csv",
+        usecols=['Latitude', 'Longitude', 'Capacity', 'Current Occupancy'],
+        dtype={'Latitude': 'float64', 'Longitude': 'float64', 'Capacity': 'int32', 'Current Occupancy': 'int32'}
+    )
+    return census_df, shelters_df
+
+@st.cache_resource
+def load_scoring_arrays():
+    # The columns scoring reads, as plain typed arrays shared read-only by every session
+    census_df, shelters_df = load_data()
+    census = {
+        'lat': census_df['Latitude'].to_numpy(),
+        'lon': census_df['Longitude'].to_numpy(),
+        'poverty': census_df['Poverty Rate (%)'].to_numpy(),
+        'unhoused': census_df['Unhoused Count'].to_numpy(),
+        'tract': census_df['Tract ID'].to_numpy()
+    }
+    # Shelter coordinates in radians, so scoring only converts the query point
+    shelters = {
+        'lat_rad': np.radians(shelters_df['Latitude'].to_numpy()),
+        'lon_rad': np.radians(shelters_df['Longitude'].to_numpy()),
+        'occupancy_ratio': shelters_df['Current Occupancy'].to_numpy() / shelters_df['Capacity'].to_numpy()
+    }
+    return census, shelters
 
-# Load data
 try:
-    census_df = pd.read_csv("data sets/mock_census_tracts_sanjose.csv")
-    shelters_df = pd.read_csv("data sets/mock_shelters_sanjose.csv")
-    pit_df = pd.read_csv("data sets/mock_pit_summary_sanjose.csv")
+    census, shelters = load_scoring_arrays()
 except FileNotFoundError:
     st.error("Data files not found. Please make sure the data files are in the correct location.")
     st.stop()
@@ -81,91 +160,32 @@ except FileNotFoundError:
 client = None
 if OPENAI_AVAILABLE:
     try:
-        api_key = st.secrets["openai"]["api_key"] if "openai" in st.secrets else os.getenv("OPENAI_API_KEY")
+        api_key = get_openai_api_key()
         if api_key:
-            # Updated client initialization
-            client = OpenAI(
-                api_key=api_key,
-                base_url="https://api.openai.com/v1"  # Explicitly set the base URL
-            )
+            client = get_openai_client(api_key)
         else:
             st.warning("OpenAI API key not found. AI chatbox will be disabled.")
     except Exception as e:
         st.warning(f"Error initializing OpenAI client: {str(e)}. AI chatbox will be disabled.")
 
-# ------------------------
-# Utility & Scoring Class
-# ------------------------
-class SiteScorer:
-    def __init__(self, lat, lon):
-        self.lat = lat
-        self.lon = lon
-
-    def haversine(self, lat1, lon1, lat2, lon2):
-        R = 6371
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
-        a = math.sin(dlat/2)**2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon/2)**2
-        return R * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+# Figures are shared read-only: st.plotly_chart serializes them without modifying them, and
+# cache_resource avoids the unpickle that cache_data would do, which costs more than building the figure
+@st.cache_resource(max_entries=256)
+def make_radar_chart(labels, values):
+    radar_fig = go.Figure(data=go.Scatterpolar(
+        r=list(values),
+        theta=list(labels),
+        fill='toself'
+    ))
+    radar_fig.update_layout(
+        polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
+        showlegend=False,
+        title="Scoring Breakdown (Radar Chart)"
+    )
+    return radar_fig
 
-    def score_location(self):
-        def distance(row):
-            return math.sqrt((row['Latitude'] - self.lat)**2 + (row['Longitude'] - self.lon)**2)
-        census_df['dist'] = census_df.apply(distance, axis=1)
-        best_row = census_df.loc[census_df['dist'].idxmin()]
-
-        # Community data
-        poverty_score = min(best_row['Poverty Rate (%)'] / 50, 1.0)
-        unhoused_score = min(best_row['Unhoused Count'] / 400, 1.0)
-        env_justice_score = 0.65
-
-        # Infrastructure score
-        infrastructure_score = (0.9 + 0.7 + 0.85) / 3
-
-        # Shelter access score
-        shelters_df['distance_km'] = shelters_df.apply(
-            lambda row: self.haversine(self.lat, self.lon, row['Latitude'], row['Longitude']), axis=1
-        )
-        nearby_shelters = shelters_df[shelters_df['distance_km'] <= 3]
-        if not nearby_shelters.empty:
-            avg_capacity_score = 1 - (nearby_shelters['Current Occupancy'] / nearby_shelters['Capacity']).mean()
-            shelter_access_score = min(avg_capacity_score, 1.0)
-        else:
-            shelter_access_score = 0.2
-
-        services_score = (shelter_access_score + 0.7 + 0.6 + 0.8) / 4
-        community_impact = (poverty_score + unhoused_score + env_justice_score) / 3
-        total_score = round(0.4 * services_score + 0.3 * infrastructure_score + 0.3 * community_impact, 2)
-
-        return {
-            "total_score": total_score,
-            "component_scores": {
-                "Access to Services": services_score,
-                "Infrastructure": infrastructure_score,
-                "Community Impact": community_impact,
-                "Poverty Rate": poverty_score,
-                "Unhoused Count": unhoused_score,
-                "Shelter Access": shelter_access_score
-            },
-            "tract_id": best_row['Tract ID']
-        }
-
-# Header
-st.markdown('<div class="header">EIH Location Scoring Model</div>', unsafe_allow_html=True)
-st.markdown('<div class="subheader">Evaluate potential Emergency Interim Housing locations using our comprehensive scoring system</div>', unsafe_allow_html=True)
-
-# Example section
-st.markdown("""
-    <div class="example-card">
-        <h4>📋 Example Addresses</h4>
-        <p>Try these San Jose addresses for testing:</p>
-        <ul>
-            <li>"200 E Santa Clara St, San Jose, CA 95113" (Downtown)</li>
-            <li>"635 Phelan Ave, San Jose, CA 95112" (East Side)</li>
-            <li>"1500 S 10th St, San Jose, CA 95112" (Central)</li>
-        </ul>
-    </div>
-""", unsafe_allow_html=True)
+# Custom CSS, header and example section, sent as one element
+st.markdown(PAGE_CSS + PAGE_HEADER_HTML + EXAMPLE_CARD_HTML, unsafe_allow_html=True)
 
 # Input parameters in sidebar
 st.sidebar.markdown('<div class="metric-title">Location Parameters</div>', unsafe_allow_html=True)
@@ -176,67 +196,28 @@ address = st.sidebar.text_input("Site Address", "200 E Santa Clara St, San Jose,
 # Analysis button
 if st.sidebar.button("Score Location", type="primary"):
     try:
-        # Geocode address with retry mechanism
-        geolocator = Nominatim(user_agent="eih_analyzer", timeout=10)
-        max_retries = 3
-        retry_delay = 2  # seconds
+        # Geocode address (cached across reruns and sessions)
+        coords = geocode_address(address)
         
-        for attempt in range(max_retries):
-            try:
-                location = geolocator.geocode(address)
-                if location:
-                    break
-            except GeocoderTimedOut:
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay)
-                    continue
-                else:
-                    raise Exception("Geocoding service timed out after multiple attempts. Please try again later.")
-        
-        if location:
-            latitude = location.latitude
-            longitude = location.longitude
+        if coords:
+            latitude, longitude = coords
             
             # Score location
-            scorer = SiteScorer(latitude, longitude)
+            scorer = SiteScorer(latitude, longitude, census, shelters)
             result = scorer.score_location()
             
             # Display results
             st.markdown('<div class="metric-title">Scoring Results</div>', unsafe_allow_html=True)
             
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                st.markdown("""
-                    <div class="metric-card">
-                        <div class="metric-title">Access to Services</div>
-                        <div style="font-size: 2rem; color: #003b73;">{:.1f}/100</div>
-                    </div>
-                """.format(result['component_scores']['Access to Services'] * 100), unsafe_allow_html=True)
-            
-            with col2:
-                st.markdown("""
-                    <div class="metric-card">
-                        <div class="metric-title">Infrastructure</div>
-                        <div style="font-size: 2rem; color: #003b73;">{:.1f}/100</div>
-                    </div>
-                """.format(result['component_scores']['Infrastructure'] * 100), unsafe_allow_html=True)
-            
-            with col3:
-                st.markdown("""
-                    <div class="metric-card">
-                        <div class="metric-title">Community Impact</div>
-                        <div style="font-size: 2rem; color: #003b73;">{:.1f}/100</div>
-                    </div>
-                """.format(result['component_scores']['Community Impact'] * 100), unsafe_allow_html=True)
-            
-            with col4:
-                st.markdown("""
-                    <div class="metric-card">
-                        <div class="metric-title">Overall Score</div>
-                        <div style="font-size: 2rem; color: #003b73;">{:.1f}/100</div>
-                    </div>
-                """.format(result['total_score'] * 100), unsafe_allow_html=True)
+            card_values = (
+                ("Access to Services", result['component_scores']['Access to Services']),
+                ("Infrastructure", result['component_scores']['Infrastructure']),
+                ("Community Impact", result['component_scores']['Community Impact']),
+                ("Overall Score", result['total_score'])
+            )
+            # All four cards go out as one element laid out by the .metric-grid rule, instead of one per column
+            metric_cards = ''.join(METRIC_CARD_TEMPLATE.format(title=title, value=value * 100) for title, value in card_values)
+            st.markdown(f'<div class="metric-grid">{metric_cards}</div>', unsafe_allow_html=True)
             
             # Display map
             st.markdown('<div class="metric-title">Location Map</div>', unsafe_allow_html=True)
@@ -257,17 +238,7 @@ if st.sidebar.button("Score Location", type="primary"):
             st.markdown('<div class="metric-title">Score Breakdown</div>', unsafe_allow_html=True)
             radar_labels = list(result["component_scores"].keys())[:3]
             radar_values = [v * 100 for k, v in result["component_scores"].items() if k in radar_labels]
-            radar_fig = go.Figure(data=go.Scatterpolar(
-                r=radar_values,
-                theta=radar_labels,
-                fill='toself'
-            ))
-            radar_fig.update_layout(
-                polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
-                showlegend=False,
-                title="Scoring Breakdown (Radar Chart)"
-            )
-            st.plotly_chart(radar_fig, use_container_width=True)
+            st.plotly_chart(make_radar_chart(tuple(radar_labels), tuple(radar_values)), use_container_width=True)
             
         else:
             st.error("Could not find the specified address. Please check the address and try again.")
@@ -290,38 +261,25 @@ if client:
     user_question = st.text_input("Ask Pia about the EIH scoring model or a specific score:")
     
     if st.button("Ask Pia"):
-        if user_question.strip():
-            with st.spinner("Pia is thinking..."):
-                try:
-                    response = client.chat.completions.create(
-                        model="gpt-3.5-turbo",
-                        messages=[
-                            {
-                                "role": "system",
-                                "content": (
-                                    "You are Pia, an experienced Emergency Interim Housing (EIH) specialist with over 15 years of experience in housing policy and urban planning. "
-                                    "You have a deep understanding of the challenges faced by unhoused communities and the importance of thoughtful site selection. "
-                                    "Your responses should be:"
-                                    "\n• Professional yet approachable"
-                                    "\n• Focused on practical insights and real-world implications"
-                                    "\n• Informed by your experience working with unhoused communities"
-                                    "\n• Clear about how different factors affect site suitability"
-                                    "\n• Empathetic to the needs of both unhoused individuals and surrounding communities"
-                                    "\nWhen explaining scores or factors, relate them to real-world impacts and community needs."
-                                )
-                            },
-                            {"role": "user", "content": user_question}
-                        ]
-                    )
-                    st.markdown("""
-                        <div class="metric-card">
-                            <div class="metric-title">Pia's Response</div>
-                            <div style="padding: 1rem;">
-                                {}
-                            </div>
-                        </div>
-                    """.format(response.choices[0].message.content), unsafe_allow_html=True)
-                except Exception as e:
-                    st.error(f"Error communicating with Pia: {str(e)}")
+        question = user_question.strip()
+        if question:
+            try:
+                # Finished answers are kept on disk, keyed on model, system prompt and question so editing either starts fresh
+                pia_key = (PIA_MODEL, PIA_SYSTEM_PROMPT, question)
+                pia_store = open_disk_cache(".pia_cache")
+                answer = pia_store.get(pia_key) if pia_store is not None else None
+
+                if answer is not None:
+                    st.markdown(PIA_RESPONSE_TEMPLATE.format(answer), unsafe_allow_html=True)
+                else:
+                    messages = [
+                        {"role": "system", "content": PIA_SYSTEM_PROMPT},
+                        {"role": "user", "content": question}
+                    ]
+                    answer = stream_completion(client, PIA_MODEL, messages, st.empty(), PIA_RESPONSE_TEMPLATE, "Pia is thinking...")
+                    if pia_store is not None:
+                        pia_store.set(pia_key, answer, expire=3600)
+            except Exception as e:
+                st.error(f"Error communicating with Pia: {str(e)}")
         else:
             st.warning("Please enter a question for Pia.")
@@ -1,60 +1,10 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.express as px
-import folium
-from streamlit_folium import folium_static
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut
-import time
 import math
+from utils.geocoding import geocode_address, is_plausible_address, warm_geocode_cache
 
-# Utility functions
-def calculate_coverage(lat, lon, radius_km, facility_type):
-    # Mock data for demonstration
-    population_covered = int(radius_km * 1000)  # Example calculation
-    area_covered = math.pi * (radius_km ** 2)
-    coverage_efficiency = min(100, (population_covered / 10000) * 100)
-    
-    analysis_report = f"""
-    <p><strong>Coverage Analysis for {facility_type}</strong></p>
-    <p>• Service radius: {radius_km} km</p>
-    <p>• Population within radius: {population_covered:,}</p>
-    <p>• Area covered: {area_covered:.2f} km²</p>
-    <p>• Coverage efficiency: {coverage_efficiency:.1f}%</p>
-    """
-    
-    return {
-        'population_covered': population_covered,
-        'area_covered': area_covered,
-        'coverage_efficiency': coverage_efficiency,
-        'analysis_report': analysis_report
-    }
-
-def plot_coverage_map(coverage_data):
-    # Create a map centered on San Jose
-    m = folium.Map(location=[37.3382, -121.8863], zoom_start=11)
-    
-    # Add a circle to represent the coverage area
-    folium.Circle(
-        location=[37.3382, -121.8863],
-        radius=coverage_data['area_covered'] * 1000,  # Convert km to meters
-        color='blue',
-        fill=True,
-        fill_opacity=0.2
-    ).add_to(m)
-    
-    return m
-
-# Set page config
-st.set_page_config(
-    page_title="EIH Service Area Coverage",
-    page_icon="🗺️",
-    layout="wide"
-)
-
-# Custom CSS
-st.markdown("""
+# Static page content
+PAGE_CSS = """
     <style>
     .main {
         padding: 2rem;
@@ -70,6 +20,11 @@ st.markdown("""
         font-size: 1.2rem;
         margin-bottom: 2rem;
     }
+    .metric-grid {
+        display: grid;
+        grid-template-columns: repeat(3, 1fr);
+        gap: 1rem;
+    }
     .metric-card {
         background-color: #bfd7ed;
         padding: 1.5rem;
@@ -92,14 +47,14 @@ st.markdown("""
         border-left: 4px solid #60a3d9;
     }
     </style>
-""", unsafe_allow_html=True)
+"""
 
-# Header
-st.markdown('<div class="header">EIH Service Area Coverage</div>', unsafe_allow_html=True)
-st.markdown('<div class="subheader">Visualize and analyze service area coverage for Emergency Interim Housing sites</div>', unsafe_allow_html=True)
+PAGE_HEADER_HTML = """
+    <div class="header">EIH Service Area Coverage</div>
+    <div class="subheader">Visualize and analyze service area coverage for Emergency Interim Housing sites</div>
+"""
 
-# Example section
-st.markdown("""
+EXAMPLE_CARD_HTML = """
     <div class="example-card">
         <h4>📋 Example Addresses</h4>
         <p>Try these San Jose addresses for testing:</p>
@@ -116,46 +71,135 @@ st.markdown("""
             <li>Emergency Shelter: 1-3 km</li>
         </ul>
     </div>
-""", unsafe_allow_html=True)
+"""
+
+# Result card markup; values are passed in already formatted
+METRIC_CARD_TEMPLATE = (
+    '<div class="metric-card">'
+    '<div class="metric-title">{title}</div>'
+    '<div style="font-size: 2rem; color: #003b73;">{value}</div>'
+    '</div>'
+)
+
+# Utility functions
+# Results depend only on the arguments, so widget changes that leave them alone are served from cache
+@st.cache_data(ttl=3600, show_spinner=False)
+def calculate_coverage(lat, lon, radius_km, facility_type):
+    # Mock data for demonstration
+    population_covered = int(radius_km * 1000)  # Example calculation
+    area_covered = math.pi * (radius_km ** 2)
+    coverage_efficiency = min(100, (population_covered / 10000) * 100)
+    
+    analysis_report = (
+        f"**Coverage Analysis for {facility_type}**\n\n"
+        f"- Service radius: {radius_km} km\n"
+        f"- Population within radius: {population_covered:,}\n"
+        f"- Area covered: {area_covered:.2f} km²\n"
+        f"- Coverage efficiency: {coverage_efficiency:.1f}%"
+    )
+    
+    return {
+        'population_covered': population_covered,
+        'area_covered': area_covered,
+        'coverage_efficiency': coverage_efficiency,
+        'analysis_report': analysis_report
+    }
+
+# Built fresh on every call: st_folium renders into the Map it is given, so one instance must not be shared across sessions
+def plot_coverage_map(area_covered):
+    # folium is only needed once a map is drawn, so it is not imported at page load
+    import folium
+
+    # Create a map centered on San Jose
+    m = folium.Map(location=[37.3382, -121.8863], zoom_start=11)
+    
+    # Add a circle to represent the coverage area
+    folium.Circle(
+        location=[37.3382, -121.8863],
+        radius=area_covered * 1000,  # Convert km to meters
+        color='blue',
+        fill=True,
+        fill_opacity=0.2
+    ).add_to(m)
+    
+    return m
+
+# Addresses offered in the example card; geocoded in the background so trying one does not wait on Nominatim
+EXAMPLE_ADDRESSES = (
+    "200 E Santa Clara St, San Jose, CA 95113",
+    "635 Phelan Ave, San Jose, CA 95112",
+    "1500 S 10th St, San Jose, CA 95112"
+)
+
+# Site types offered in the sidebar
+SITE_TYPES = ("Temporary Shelter", "Transitional Housing", "Supportive Housing", "Emergency Shelter")
+
+# Upper bound on a bulk upload; at Nominatim's one request per second this is under two minutes of lookups
+MAX_BULK_ADDRESSES = 100
+
+# Set page config
+st.set_page_config(
+    page_title="EIH Service Area Coverage",
+    page_icon="🗺️",
+    layout="wide"
+)
+
+# Custom CSS, header and example section, sent as one element
+st.markdown(PAGE_CSS + PAGE_HEADER_HTML + EXAMPLE_CARD_HTML, unsafe_allow_html=True)
+
+# Pre-geocode the example addresses (once per process)
+warm_geocode_cache(EXAMPLE_ADDRESSES)
+
+# Shareable links: ?address=...&radius=...&type=... prefill the sidebar and run the analysis on the first run of a
+# session. Read once per session, since widget defaults that change between reruns would reset the widgets.
+if "link_defaults" not in st.session_state:
+    params = st.query_params
+    try:
+        link_radius = min(max(int(params.get("radius", 10)), 1), 50)
+    except ValueError:
+        link_radius = 10
+    st.session_state["link_defaults"] = {
+        "address": params.get("address", EXAMPLE_ADDRESSES[0]),
+        "radius": link_radius,
+        "type": params.get("type") if params.get("type") in SITE_TYPES else SITE_TYPES[0],
+        "run": "address" in params
+    }
+link_defaults = st.session_state["link_defaults"]
+auto_run = link_defaults["run"]
+link_defaults["run"] = False
 
 # Input parameters in sidebar
 st.sidebar.markdown('<div class="metric-title">Coverage Parameters</div>', unsafe_allow_html=True)
 
 # Location inputs
 st.sidebar.markdown("### Location")
-address = st.sidebar.text_input("Site Address", "200 E Santa Clara St, San Jose, CA 95113")
+address = st.sidebar.text_input("Site Address", link_defaults["address"])
 
 # Coverage parameters
 st.sidebar.markdown("### Coverage Details")
-radius_km = st.sidebar.slider("Service Radius (km)", min_value=1, max_value=50, value=10)
-facility_type = st.sidebar.selectbox(
-    "Site Type",
-    ["Temporary Shelter", "Transitional Housing", "Supportive Housing", "Emergency Shelter"]
-)
+radius_km = st.sidebar.slider("Service Radius (km)", min_value=1, max_value=50, value=link_defaults["radius"])
+facility_type = st.sidebar.selectbox("Site Type", SITE_TYPES, index=SITE_TYPES.index(link_defaults["type"]))
 
 # Analysis button
-if st.sidebar.button("Analyze Coverage", type="primary"):
+analyze_clicked = st.sidebar.button("Analyze Coverage", type="primary")
+
+# Bulk geocoding from a CSV with an "address" column
+st.sidebar.markdown("### Bulk Analysis")
+uploaded_file = st.sidebar.file_uploader("CSV of addresses", type="csv")
+bulk_clicked = st.sidebar.button("Geocode Addresses", disabled=uploaded_file is None)
+
+if (analyze_clicked or auto_run) and not is_plausible_address(address):
+    st.error(f'Please enter a street address, for example "{EXAMPLE_ADDRESSES[0]}".')
+elif analyze_clicked or auto_run:
     try:
-        # Geocode address with retry mechanism
-        geolocator = Nominatim(user_agent="eih_analyzer", timeout=10)
-        max_retries = 3
-        retry_delay = 2  # seconds
+        # Geocode address (cached across reruns and sessions)
+        coords = geocode_address(address)
         
-        for attempt in range(max_retries):
-            try:
-                location = geolocator.geocode(address)
-                if location:
-                    break
-            except GeocoderTimedOut:
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay)
-                    continue
-                else:
-                    raise Exception("Geocoding service timed out after multiple attempts. Please try again later.")
-        
-        if location:
-            latitude = location.latitude
-            longitude = location.longitude
+        if coords:
+            latitude, longitude = coords
+            
+            # Keep the URL in step with the analysis so it can be shared
+            st.query_params.update({"address": address, "radius": str(radius_km), "type": facility_type})
             
             # Calculate coverage
             coverage_data = calculate_coverage(latitude, longitude, radius_km, facility_type)
@@ -163,48 +207,72 @@ if st.sidebar.button("Analyze Coverage", type="primary"):
             # Display coverage metrics
             st.markdown('<div class="metric-title">Coverage Metrics</div>', unsafe_allow_html=True)
             
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.markdown("""
-                    <div class="metric-card">
-                        <div class="metric-title">Population Covered</div>
-                        <div style="font-size: 2rem; color: #003b73;">{:,}</div>
-                    </div>
-                """.format(int(coverage_data['population_covered'])), unsafe_allow_html=True)
-            
-            with col2:
-                st.markdown("""
-                    <div class="metric-card">
-                        <div class="metric-title">Area Covered</div>
-                        <div style="font-size: 2rem; color: #003b73;">{:.2f} km²</div>
-                    </div>
-                """.format(coverage_data['area_covered']), unsafe_allow_html=True)
-            
-            with col3:
-                st.markdown("""
-                    <div class="metric-card">
-                        <div class="metric-title">Coverage Efficiency</div>
-                        <div style="font-size: 2rem; color: #003b73;">{:.1f}%</div>
-                    </div>
-                """.format(coverage_data['coverage_efficiency']), unsafe_allow_html=True)
+            # All three cards go out as one element laid out by the .metric-grid rule, instead of one per column
+            metric_cards = ''.join((
+                METRIC_CARD_TEMPLATE.format(title="Population Covered", value=f"{int(coverage_data['population_covered']):,}"),
+                METRIC_CARD_TEMPLATE.format(title="Area Covered", value=f"{coverage_data['area_covered']:.2f} km²"),
+                METRIC_CARD_TEMPLATE.format(title="Coverage Efficiency", value=f"{coverage_data['coverage_efficiency']:.1f}%")
+            ))
+            st.markdown(f'<div class="metric-grid">{metric_cards}</div>', unsafe_allow_html=True)
             
             # Display coverage map
             st.markdown('<div class="metric-title">Coverage Map</div>', unsafe_allow_html=True)
-            coverage_map = plot_coverage_map(coverage_data)
-            folium_static(coverage_map, width=1200, height=600)
+            from streamlit_folium import st_folium
+
+            # returned_objects=[] keeps the map one-way: panning and zooming stay in the browser instead of rerunning the page
+            coverage_map = plot_coverage_map(coverage_data['area_covered'])
+            st_folium(coverage_map, height=600, use_container_width=True, returned_objects=[])
             
             # Display detailed analysis
             st.markdown('<div class="metric-title">Detailed Analysis</div>', unsafe_allow_html=True)
-            st.markdown(f"""
-                <div class="metric-card">
-                    {coverage_data['analysis_report']}
-                </div>
-            """, unsafe_allow_html=True)
+            with st.container(border=True):
+                st.markdown(coverage_data['analysis_report'])
         else:
             st.error("Could not find the specified address. Please check the address and try again.")
         
     except Exception as e:
         st.error(f"Error during analysis: {str(e)}")
+elif bulk_clicked:
+    try:
+        # Check the header before the full read so other parse errors are reported as they are
+        if "address" not in pd.read_csv(uploaded_file, nrows=0).columns:
+            st.error('The CSV must have an "address" column.')
+            st.stop()
+        uploaded_file.seek(0)
+        addresses = pd.read_csv(uploaded_file, usecols=["address"], dtype=str)["address"].dropna().str.strip()
+        addresses = addresses[addresses != ""].drop_duplicates().tolist()
+        if len(addresses) > MAX_BULK_ADDRESSES:
+            st.warning(f"Only the first {MAX_BULK_ADDRESSES} of {len(addresses)} addresses will be geocoded.")
+            addresses = addresses[:MAX_BULK_ADDRESSES]
+
+        # Addresses are looked up one at a time: cached ones return at once, the rest are paced at
+        # Nominatim's one request per second by the shared geocoder
+        progress = st.progress(0.0, text="Geocoding addresses...")
+        rows = []
+        for i, bulk_address in enumerate(addresses, 1):
+            try:
+                coords = geocode_address(bulk_address)
+            except Exception:
+                coords = None
+            rows.append({
+                "address": bulk_address,
+                "lat": coords[0] if coords else None,
+                "lon": coords[1] if coords else None
+            })
+            progress.progress(i / len(addresses), text=f"Geocoded {i} of {len(addresses)} addresses")
+        progress.empty()
+
+        results = pd.DataFrame(rows, columns=["address", "lat", "lon"])
+        found = results.dropna()
+        st.markdown('<div class="metric-title">Bulk Geocoding Results</div>', unsafe_allow_html=True)
+        st.dataframe(results, hide_index=True, use_container_width=True)
+        if len(found) < len(results):
+            st.warning(f"{len(results) - len(found)} address(es) could not be found.")
+        if not found.empty:
+            st.map(found, latitude="lat", longitude="lon")
+    except pd.errors.EmptyDataError:
+        st.error("The uploaded CSV is empty.")
+    except Exception as e:
+        st.error(f"Error during bulk analysis: {str(e)}")
 else:
     st.info("Please enter the site address and coverage parameters in the sidebar to begin analysis.")
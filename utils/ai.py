@@ -0,0 +1,38 @@
+import streamlit as st
+import importlib.util
+import os
+import time
+
+# OpenAI is optional; it is only imported when a client is first created
+OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
+
+def get_openai_api_key():
+    # load_if_toml_exists avoids Streamlit's error box when no secrets.toml is present
+    has_secrets = st.secrets.load_if_toml_exists()
+    return st.secrets["openai"]["api_key"] if has_secrets and "openai" in st.secrets else os.getenv("OPENAI_API_KEY")
+
+@st.cache_resource
+def get_openai_client(api_key):
+    # One client (and HTTP connection pool) per key, reused across reruns and sessions
+    from openai import OpenAI
+
+    return OpenAI(
+        api_key=api_key,
+        base_url="https://api.openai.com/v1"  # Explicitly set the base URL
+    )
+
+def stream_completion(client, model, messages, placeholder, template, spinner_text):
+    # Spinner only covers the wait for the first token; the text then renders into the placeholder as it streams
+    with st.spinner(spinner_text):
+        response = client.chat.completions.create(model=model, messages=messages, stream=True)
+    text = ""
+    last_flush = time.monotonic()
+    for i, chunk in enumerate(response, 1):
+        if chunk.choices:
+            text += chunk.choices[0].delta.content or ""
+        # Coalesce tokens: re-render every 50 ms or 8 chunks rather than once per token
+        if time.monotonic() - last_flush > 0.05 or i % 8 == 0:
+            placeholder.markdown(template.format(text), unsafe_allow_html=True)
+            last_flush = time.monotonic()
+    placeholder.markdown(template.format(text), unsafe_allow_html=True)
+    return text
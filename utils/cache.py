@@ -0,0 +1,16 @@
+import streamlit as st
+
+# Persist results on disk when diskcache is installed; otherwise callers fall back to their in-memory caches
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+@st.cache_resource
+def open_disk_cache(directory):
+    # One on-disk cache per directory, shared by all sessions and kept across server restarts.
+    # Returns None when diskcache is not installed.
+    if not DISKCACHE_AVAILABLE:
+        return None
+    return diskcache.Cache(directory)
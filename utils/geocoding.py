@@ -0,0 +1,181 @@
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx
+from functools import partial
+import logging
+import os
+import random
+import threading
+import time
+from utils.cache import open_disk_cache
+
+# Preferred geocoding service: "nominatim" (default), or a faster "photon" / "pelias" server when one is configured.
+# Nominatim stays behind any other provider as the fallback.
+GEOCODER_PROVIDERS = ("nominatim", "photon", "pelias")
+GEOCODER = os.environ.get("GEOCODER", "nominatim").lower()
+if GEOCODER not in GEOCODER_PROVIDERS:
+    logging.getLogger(__name__).warning("Unknown GEOCODER %r; using nominatim.", GEOCODER)
+    GEOCODER = "nominatim"
+elif GEOCODER == "pelias" and not os.environ.get("PELIAS_DOMAIN"):
+    logging.getLogger(__name__).warning("GEOCODER=pelias needs PELIAS_DOMAIN; using nominatim.")
+    GEOCODER = "nominatim"
+GEOCODER_CHAIN = (GEOCODER, "nominatim") if GEOCODER != "nominatim" else ("nominatim",)
+
+@st.cache_resource
+def get_geolocator(provider="nominatim"):
+    # One shared client per provider; the requests adapter keeps its HTTPS connection pool alive between lookups.
+    # Its own connection retries are off so the backoff loop in _lookup is the only retry layer.
+    # geopy is imported here, on the first lookup, so pages load without paying for it.
+    from geopy.adapters import RequestsAdapter
+    from geopy.geocoders import Nominatim, Pelias, Photon
+
+    adapter_factory = partial(RequestsAdapter, pool_connections=1, max_retries=0)
+    if provider == "photon":
+        return Photon(domain=os.environ.get("PHOTON_DOMAIN", "photon.komoot.io"), user_agent="eih_analyzer",
+                      timeout=10, adapter_factory=adapter_factory)
+    if provider == "pelias":
+        return Pelias(domain=os.environ["PELIAS_DOMAIN"], api_key=os.environ.get("PELIAS_API_KEY"),
+                      user_agent="eih_analyzer", timeout=10, adapter_factory=adapter_factory)
+    return Nominatim(user_agent="eih_analyzer", timeout=10, adapter_factory=adapter_factory)
+
+# GEOCACHE_DIR points the disk stores at a persistent volume when the working directory is not kept between deploys
+GEOCACHE_DIR = os.environ.get("GEOCACHE_DIR", ".geocode_cache")
+
+def get_geocode_store():
+    # On-disk geocode cache, or None without diskcache (only the in-memory cache is used then)
+    return open_disk_cache(GEOCACHE_DIR)
+
+def get_gate_store():
+    # The cross-process rate gate lives in its own small store, so culling the results never touches it
+    # and a request slot does not write to the results database
+    return open_disk_cache(os.path.join(GEOCACHE_DIR, "gate"))
+
+# Nominatim's usage policy allows one request per second per application. Every lookup in the process takes a turn
+# behind the lock, so warm-up threads, bulk runs and concurrent sessions cannot burst past it; when diskcache is
+# available, server processes sharing it also take turns through an expiring gate key (the SET NX EX pattern).
+NOMINATIM_GATE_KEY = "nominatim"
+_request_lock = threading.Lock()
+_last_request = [0.0]
+# Lookups made for users that are waiting for a slot; the warm-up thread stands aside while there are any
+_waiting_lock = threading.Lock()
+_waiting = [0]
+_background = threading.local()
+
+def _wait_for_request_slot():
+    if getattr(_background, "warming", False):
+        while _waiting[0]:
+            time.sleep(0.05)
+        _take_request_slot()
+        return
+    with _waiting_lock:
+        _waiting[0] += 1
+    try:
+        _take_request_slot()
+    finally:
+        with _waiting_lock:
+            _waiting[0] -= 1
+
+def _take_request_slot():
+    with _request_lock:
+        wait = 1.0 - (time.monotonic() - _last_request[0])
+        if wait > 0:
+            time.sleep(wait)
+        gate = get_gate_store()
+        if gate is not None:
+            while not gate.add(NOMINATIM_GATE_KEY, True, expire=1.0):
+                time.sleep(0.05)
+        _last_request[0] = time.monotonic()
+
+def _lookup(provider, address):
+    from geopy.exc import GeocoderRateLimited, GeocoderTimedOut, GeocoderUnavailable
+    from geopy.geocoders import Nominatim
+
+    # Geocode address with retry mechanism: exponential backoff with jitter, bounded by a time budget
+    geolocator = get_geolocator(provider)
+    max_retries = 3
+    base_delay = 0.25  # seconds
+    deadline = time.monotonic() + 20  # seconds
+    # Gate on the client itself, so every request that reaches Nominatim respects its rate limit
+    rate_limited = isinstance(geolocator, Nominatim)
+
+    for attempt in range(max_retries):
+        try:
+            if rate_limited:
+                _wait_for_request_slot()
+            # Short first timeout so a stalled request is retried quickly; later attempts wait longer
+            return geolocator.geocode(address, timeout=min(3 + 2 * attempt, 10))
+        except (GeocoderTimedOut, GeocoderUnavailable, GeocoderRateLimited) as e:
+            # Honor the server's Retry-After hint when we are being rate limited
+            delay = getattr(e, "retry_after", None) or base_delay * (2 ** attempt) + random.uniform(0, 0.1)
+            if attempt < max_retries - 1 and time.monotonic() + delay < deadline:
+                time.sleep(delay)
+                continue
+            else:
+                raise Exception("Geocoding service did not respond after multiple attempts. Please try again later.")
+
+@st.cache_data(ttl=86400, show_spinner=False)
+def _geocode(address):
+    store = get_geocode_store()
+    if store is not None:
+        coords = store.get(address)
+        if coords is not None:
+            return coords
+
+    # Try each provider in turn; a failure or a miss on the preferred one falls through to Nominatim
+    location = None
+    for i, provider in enumerate(GEOCODER_CHAIN):
+        try:
+            location = _lookup(provider, address)
+        except Exception:
+            if i == len(GEOCODER_CHAIN) - 1:
+                raise
+            continue
+        if location:
+            break
+
+    if not location:
+        return None
+
+    coords = (location.latitude, location.longitude)
+    if store is not None:
+        store.set(address, coords, expire=30 * 86400)
+    return coords
+
+def normalize_address(address):
+    # Collapse whitespace and case so trivially different spellings share one cache entry
+    return " ".join(address.split()).lower()
+
+def is_plausible_address(address):
+    # Cheap local check so empty or junk input never spends a rate-limited request. Deliberately loose:
+    # Nominatim resolves partial addresses and place names, so only input with no letters or under 3 characters fails
+    address = address.strip()
+    return len(address) >= 3 and any(c.isalpha() for c in address)
+
+def geocode_address(address):
+    if not is_plausible_address(address):
+        return None
+    return _geocode(normalize_address(address))
+
+def _warm(addresses):
+    _background.warming = True
+    for address in addresses:
+        try:
+            geocode_address(address)
+        except Exception:
+            # Warming is best effort; a failed lookup is simply retried when a user asks for it
+            pass
+
+@st.cache_resource
+def warm_geocode_cache(addresses):
+    # Geocode a fixed set of addresses once per process, on a background thread so no page waits on it.
+    # Lookups go through the normal cached path, so later requests for these addresses skip the network.
+    # Addresses already in the disk store are dropped here, so a restarted server takes no gate slots for them.
+    store = get_geocode_store()
+    pending = tuple(a for a in addresses if store is None or normalize_address(a) not in store)
+    if not pending:
+        return None
+    thread = threading.Thread(target=_warm, args=(pending,), daemon=True)
+    # The cached lookups expect a script context, so the thread borrows the one of the session that started it.
+    # It never draws with it, and it exits after these few lookups rather than living as long as the process.
+    add_script_run_ctx(thread)
+    thread.start()
+    return thread
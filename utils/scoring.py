@@ -0,0 +1,74 @@
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+
+# Fixed score components, folded once at import instead of on every call
+ENV_JUSTICE_SCORE = 0.65
+INFRASTRUCTURE_SCORE = (0.9 + 0.7 + 0.85) / 3
+SERVICES_BASE = (0.7 + 0.6 + 0.8) / 4
+
+# Shelter search radius in haversine() units, and the query-independent parts of its bounding box
+SHELTER_RADIUS_KM = 3
+SHELTER_LAT_WINDOW = 2 * SHELTER_RADIUS_KM / EARTH_RADIUS_KM * 1.000001
+SHELTER_SIN_RADIUS = np.sin(SHELTER_RADIUS_KM / EARTH_RADIUS_KM)
+
+# ------------------------
+# Utility & Scoring Class
+# ------------------------
+class SiteScorer:
+    # census and shelters are the column-array dicts built by the page's load_scoring_arrays()
+    def __init__(self, lat, lon, census, shelters):
+        self.lat = lat
+        self.lon = lon
+        self.census = census
+        self.shelters = shelters
+
+    def haversine(self, lat1, lon1, lat2, lon2):
+        # Coordinates in radians; NumPy ufuncs so lat2/lon2 can be whole columns
+        a = np.sin((lat2 - lat1)/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1)/2)**2
+        # arcsin(sqrt(a)) equals atan2(sqrt(a), sqrt(1 - a)) on [0, 1] with one sqrt and one trig call fewer
+        return EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+    def score_location(self):
+        # Nearest tract by squared distance over all tracts at once
+        census = self.census
+        shelters = self.shelters
+        best = np.argmin((census['lat'] - self.lat)**2 + (census['lon'] - self.lon)**2)
+
+        # Community data
+        poverty_score = min(census['poverty'][best] / 50, 1.0)
+        unhoused_score = min(census['unhoused'][best] / 400, 1.0)
+        # Shelter access score
+        # Bounding-box cull: skip shelters whose lat or lon gap alone puts haversine() past 3 (padded for rounding)
+        lat_rad, lon_rad = np.radians(self.lat), np.radians(self.lon)
+        cos_lat = np.cos(lat_rad)
+        cos_far = np.cos(abs(lat_rad) + SHELTER_LAT_WINDOW)
+        sin_ratio = min(1.0, SHELTER_SIN_RADIUS / np.sqrt(cos_lat * cos_far))
+        lon_window = 2 * np.arcsin(sin_ratio) * 1.000001
+        near_lat = np.abs(shelters['lat_rad'] - lat_rad) <= SHELTER_LAT_WINDOW
+        near_lon = np.abs(shelters['lon_rad'] - lon_rad) <= lon_window
+        candidate = near_lat & near_lon
+        distance_km = self.haversine(lat_rad, lon_rad, shelters['lat_rad'][candidate], shelters['lon_rad'][candidate])
+        nearby = distance_km <= SHELTER_RADIUS_KM
+        if nearby.any():
+            avg_capacity_score = 1 - shelters['occupancy_ratio'][candidate][nearby].mean()
+            shelter_access_score = min(avg_capacity_score, 1.0)
+        else:
+            shelter_access_score = 0.2
+
+        services_score = shelter_access_score / 4 + SERVICES_BASE
+        community_impact = (poverty_score + unhoused_score + ENV_JUSTICE_SCORE) / 3
+        total_score = round(0.4 * services_score + 0.3 * INFRASTRUCTURE_SCORE + 0.3 * community_impact, 2)
+
+        return {
+            "total_score": total_score,
+            "component_scores": {
+                "Access to Services": services_score,
+                "Infrastructure": INFRASTRUCTURE_SCORE,
+                "Community Impact": community_impact,
+                "Poverty Rate": poverty_score,
+                "Unhoused Count": unhoused_score,
+                "Shelter Access": shelter_access_score
+            },
+            "tract_id": census['tract'][best]
+        }